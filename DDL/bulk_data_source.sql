@@ -0,0 +1,14 @@
+-- Only needed for the optional BULK INSERT path of scripts/historical_loader.py.
+-- Set BULK_DATA_SOURCE=staging_blob and BLOB_CONTAINER_NAME_STAGING=staging to enable it.
+CREATE MASTER KEY ENCRYPTION BY PASSWORD = '<strong password>';
+
+CREATE DATABASE SCOPED CREDENTIAL [staging_blob_credential]
+WITH IDENTITY = 'SHARED ACCESS SIGNATURE',
+     SECRET = '<SAS token with read access, without the leading ?>';
+
+CREATE EXTERNAL DATA SOURCE [staging_blob]
+WITH (
+    TYPE = BLOB_STORAGE,
+    LOCATION = 'https://<storage account>.blob.core.windows.net/staging',
+    CREDENTIAL = [staging_blob_credential]
+);
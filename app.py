@@ -1,136 +1,193 @@
 import os
-import json
+import orjson
 import pyodbc
 import logging
-import pandas as pd
 
 from pathlib import Path
+from itertools import chain
 from fastavro import reader
 from datetime import datetime
 from modules.table_rules.jobs import Job
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from modules.utils.execute_query import execute_query
 from modules.table_rules.department import Departments
 from modules.table_rules.hired_employees import HiredEmployees
-from modules.utils.db_connection import get_sql_server_connection
-from modules.utils.avro_functions import get_avro_schema_for_table
+from modules.utils.db_connection import checkout
+from modules.utils.avro_functions import get_avro_fields_for_table, get_avro_insert_sql_for_table
 from modules.utils.blob_storage_connection import get_blob_service_client
 
 
 LOG_FOLDER = os.path.join(Path(__file__).parent, 'log', 'rejected_api')
 TEMP_DIR = os.path.join(Path(__file__).parents[0], 'tmp')
-
+RESTORE_BATCH_SIZE = 1000
+BLOB_DOWNLOAD_CONCURRENCY = 8
+
+VALIDATORS = {
+    'jobs': Job,
+    'departments': Departments,
+    'hired_employees': HiredEmployees,
+}
+
+INSERT_SQL = {
+    table_name: (
+        f"INSERT INTO migration_tables.{table_name} ({', '.join(validator.insert_columns)}) "
+        f"VALUES ({', '.join('?' for _ in validator.insert_columns)})"
+    )
+    for table_name, validator in VALIDATORS.items()
+}
+
+# Parameter types and sizes of insert_columns, matching the DDL, so pyodbc can
+# bind the batch without inferring the ODBC type of every parameter.
+INPUT_SIZES = {
+    'jobs': [(pyodbc.SQL_WVARCHAR, 255, 0)],
+    'departments': [(pyodbc.SQL_WVARCHAR, 255, 0)],
+    'hired_employees': [
+        (pyodbc.SQL_VARCHAR, 255, 0),
+        (pyodbc.SQL_VARCHAR, 100, 0),
+        (pyodbc.SQL_INTEGER, 0, 0),
+        (pyodbc.SQL_INTEGER, 0, 0),
+    ],
+}
+
+# Set up the rejected rows logger once per process instead of on every request.
+os.makedirs(LOG_FOLDER, exist_ok=True)
 rejected_rows_logger = logging.getLogger('rejected_rows_logger')
+if not rejected_rows_logger.handlers:
+    file_handler = logging.FileHandler(os.path.join(LOG_FOLDER, f'rejected_rows_{datetime.now().strftime("%Y_%m_%d")}.log'), mode='a', encoding='utf-8')
+    formatter = logging.Formatter('%(asctime)s - %(message)s')
+    file_handler.setFormatter(formatter)
+    rejected_rows_logger.addHandler(file_handler)
+    rejected_rows_logger.setLevel(logging.WARNING)
+rejected_rows_handler = rejected_rows_logger.handlers[0]
 
 app = Flask(__name__)
 
+
+def ojsonify(obj, status=200):
+    """
+    Serializes an object with orjson and wraps it in a JSON Flask response.
+
+    :param obj: The object to serialize.
+    :param status: The HTTP status code of the response.
+    :return: A Flask response with the application/json mimetype.
+    """
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+
+def log_rejected_rows(rejected):
+    """
+    Appends the rejected rows to the rejected rows log, one JSON object per line.
+
+    Serializes each rejected dict with orjson and writes the whole request's
+    rejections to the handler's stream at once, under the handler lock, so
+    lines from concurrent requests are never interleaved.
+
+    :param rejected: The rejected rows returned by the validator.
+    """
+    record = rejected_rows_logger.makeRecord(
+        rejected_rows_logger.name, logging.WARNING, __file__, 0, "\0", None, None)
+    # Format once with a NUL placeholder as the message; whatever the formatter
+    # puts around it (timestamp, level, ...) is reused for every rejected row.
+    prefix, suffix = rejected_rows_handler.format(record).split("\0", 1)
+    terminator = rejected_rows_handler.terminator
+    payload = ''.join(f"{prefix}{orjson.dumps(entry).decode()}{suffix}{terminator}" for entry in rejected)
+
+    rejected_rows_handler.acquire()
+    try:
+        rejected_rows_handler.stream.write(payload)
+        rejected_rows_handler.flush()
+    except Exception:
+        rejected_rows_handler.handleError(record)
+    finally:
+        rejected_rows_handler.release()
+
+
+def load_json_body():
+    """
+    Parses the raw request body with orjson.
+
+    :return: The decoded payload, or None if the body is empty or not valid JSON.
+    """
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+
+
 @app.route('/api/v1/batch-insert', methods=['POST'])
 def batch_insert():
-    data = request.json
-    table_name = data['table_name']
-    rows = data['rows']
+    data = load_json_body()
 
     if not isinstance(data, dict):
-        return jsonify({
+        return ojsonify({
             'error': 'Invalid JSON format. Expected a dictionary.',
             'code': 400
-        }), 400
+        }, 400)
     
     table_name: str = data.get('table_name')
     rows: list = data.get('rows')
     if not table_name:
-        return jsonify({
+        return ojsonify({
             'error': 'Missing "table_name" in request payload.',
             'code': 400
-        }), 400
+        }, 400)
     
     if not rows:
-        return jsonify({
+        return ojsonify({
             'error': 'Missing "rows" data in request payload.',
             'code': 400
-        }), 400
+        }, 400)
 
     if not isinstance(rows, list):
-        return jsonify({
+        return ojsonify({
             'error': '"rows" field must be a list.',
             'code': 400
-        }), 400
+        }, 400)
     
     BATCH_LIMIT = 1000
     if len(rows) > BATCH_LIMIT:
-        return jsonify({
+        return ojsonify({
             'error': f'Row count exceeds the limit of {BATCH_LIMIT}.',
             'code': 400
-        }), 400
+        }, 400)
     
-    if table_name == 'jobs':
-        validator = Job(rows)
-
-    elif table_name == 'departments':
-        validator = Departments(rows)
-
-    elif table_name == 'hired_employees':
-        validator = HiredEmployees(rows)
-
-    else:
-        return jsonify({
+    validator_class = VALIDATORS.get(table_name)
+    if validator_class is None:
+        return ojsonify({
             'error': f'Table name "{table_name}" not recognized or supported by the system.',
             'code': 400
         })
     
-    insert_columns = validator.insert_columns
-    accepted, rejected = validator.validate_schema()
-
-    if not rejected_rows_logger.handlers:
-        file_handler = logging.FileHandler(os.path.join(LOG_FOLDER, f'rejected_{table_name}_{datetime.now().strftime("%Y_%m_%d_%I_%M_%S")}.log'), mode='a', encoding='utf-8')
-        formatter = logging.Formatter('%(asctime)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        rejected_rows_logger.addHandler(file_handler)
-        rejected_rows_logger.setLevel(logging.WARNING)
+    data_to_insert, rejected = validator_class(rows).validate_for_insert()
 
     if rejected:
-        for rejected_entry in rejected:
-            rejected_rows_logger.warning(json.dumps(rejected_entry, ensure_ascii=False))
+        log_rejected_rows(rejected)
     
     # --- Lógica de inserción en la base de datos ---
     try:
-        db_conn = get_sql_server_connection()
-        cursor = db_conn.cursor()
-        
-        placeholders = ', '.join(['?' for _ in insert_columns])
-        insert_sql = f"INSERT INTO migration_tables.{table_name} ({', '.join(insert_columns)}) VALUES ({placeholders})"
-        
-
-        df_accepted = pd.DataFrame(accepted)
-        if not df_accepted.empty:
-            data_to_insert = [tuple(row) for row in df_accepted[insert_columns].values]
-            cursor.executemany(insert_sql, data_to_insert)
-            db_conn.commit()
+        with checkout() as db_conn:
+            cursor = db_conn.cursor()
+            cursor.fast_executemany = True
+            cursor.setinputsizes(INPUT_SIZES[table_name])
+
+            if data_to_insert:
+                cursor.executemany(INSERT_SQL[table_name], data_to_insert)
+            cursor.close()
             inserted_count = len(data_to_insert)
-        else:
-            db_conn.commit()
-            inserted_count = 0
 
     except Exception as e:
-        if db_conn:
-            db_conn.rollback()
         app.logger.error(f"Database insertion failed for table {table_name}: {e}", exc_info=True)
-        return jsonify({
+        return ojsonify({
             'error': 'An error occurred during database insertion.',
             'details': str(e),
             'code': 500
-        }), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if db_conn:
-            db_conn.close()
+        }, 500)
     
     response_message = f"Batch insert processed. Accepted {inserted_count} rows, rejected {len(rejected)} rows."
     if rejected:
         response_message += " See logs/rejected_rows_YYYY_MM_DD.log for details on rejected rows."
 
-    return jsonify({
+    return ojsonify({
         'status': 1,
         'message': response_message,
         'data': [{
@@ -141,7 +198,7 @@ def batch_insert():
             'version': '1.0.0',
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-    }), 200
+    }, 200)
 
 
 @app.route('/api/v1/employees-by-quarter', methods=['GET'])
@@ -150,39 +207,28 @@ def hello_world():
     year = int(year_param)
 
     if not year:
-        return jsonify({
+        return ojsonify({
             'error': 'Parameter year is necessary',
             'code': 400
         })
     else:
-        try:
-            db_conn = get_sql_server_connection()
+        with checkout() as db_conn:
             query_results = execute_query('count_quartes', year, db_conn)
-            formatted_results = []
-            for row in query_results:
-                formatted_results.append({
-                    "department": row[0],
-                    "job": row[1],
-                    "Q1": row[2],
-                    "Q2": row[3],
-                    "Q3": row[4],
-                    "Q4": row[5]
-                })
-
-            return jsonify({
-                "status": 1,
-                "message": "success",
-                "data": formatted_results,
-                "metadata": {
-                    "version": "1.0.0",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-            }), 200
-
-        except Exception as e:
-            if db_conn:
-                db_conn.rollback()
-            raise
+
+        formatted_results = [
+            {"department": department, "job": job, "Q1": q1, "Q2": q2, "Q3": q3, "Q4": q4}
+            for department, job, q1, q2, q3, q4 in query_results
+        ]
+
+        return ojsonify({
+            "status": 1,
+            "message": "success",
+            "data": formatted_results,
+            "metadata": {
+                "version": "1.0.0",
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+        }, 200)
 
 
 @app.route('/api/v1/employees-hired', methods=['GET'])
@@ -191,44 +237,35 @@ def employees_hired():
     year = int(year_param)
 
     if not year:
-        return jsonify({
+        return ojsonify({
             'error': 'Parameter year is necessary',
             'code': 400
         })
     else:
-        try:
-            db_conn = get_sql_server_connection()
+        with checkout() as db_conn:
             query_results = execute_query('hired_employees', year, db_conn)
-            formatted_results = []
-            
-            for row in query_results:
-                formatted_results.append({
-                    "id": row[0],
-                    "department": row[1],
-                    "hired": row[2]
-                })
-
-            return jsonify({
-                "status": 1,
-                "message": "success",
-                "data": formatted_results,
-                "metadata": {
-                    "version": "1.0.0",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-            }), 200
-
-        except Exception as e:
-            if db_conn:
-                db_conn.rollback()
-            raise
+
+        formatted_results = [
+            {"id": department_id, "department": department, "hired": hired}
+            for department_id, department, hired in query_results
+        ]
+
+        return ojsonify({
+            "status": 1,
+            "message": "success",
+            "data": formatted_results,
+            "metadata": {
+                "version": "1.0.0",
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+        }, 200)
 
 
 @app.route('/api/v1/restored-table', methods=['POST'])
 def restored_table():
-    data = request.json
+    data = load_json_body()
     if not data:
-        return jsonify({
+        return ojsonify({
             'error': 'No JSON payload provided.',
             'code': 400
         })
@@ -237,55 +274,72 @@ def restored_table():
     avro_blob_path = data['avro_file_path_in_blob']
 
     full_table_name_sql = f"migration_tables.{table_name}"
-    avro_schema = get_avro_schema_for_table(table_name)
+    avro_fields = get_avro_fields_for_table(table_name)
+    insert_sql = get_avro_insert_sql_for_table(table_name)
+    if avro_fields is None:
+        return ojsonify({
+            'error': f'Table name "{table_name}" not recognized or supported by the system.',
+            'code': 400
+        }, 400)
 
     os.makedirs(TEMP_DIR, exist_ok=True)
 
     local_avro_path = os.path.join(TEMP_DIR, os.path.basename(avro_blob_path))
-    db_conn = None
-    container_client = None
-    temp_blob_service_client = get_blob_service_client()
-    container_client = temp_blob_service_client.get_container_client("backup")
+    container_client = get_blob_service_client().get_container_client("backup")
     blob_client = container_client.get_blob_client(avro_blob_path)
     with open(local_avro_path, "wb") as download_file:
-        download_file.write(blob_client.download_blob().readall())
-
-    records = []
-    with open(local_avro_path, 'rb') as fo:
-        avro_reader = reader(fo)
-        for record in avro_reader:
-            records.append(record)
-        if not records:
-            return jsonify({"status": "warning", "message": "No records found in AVRO file, nothing restored."}), 200
-
-    db_conn = get_sql_server_connection()
-    cursor = db_conn.cursor()
-    avro_fields = [f['name'] for f in avro_schema['fields'] if f['name'] != 'id']
-    columns_sql = ", ".join([f"{col}" for col in avro_fields])
-    placeholders = ", ".join(["?"] * len(avro_fields))
-
-    try:
-        cursor.execute(f"TRUNCATE TABLE {full_table_name_sql}")
-        db_conn.commit()
-    except Exception as e:
-        db_conn.rollback()
+        blob_client.download_blob(max_concurrency=BLOB_DOWNLOAD_CONCURRENCY).readinto(download_file)
 
-    insert_sql = f"INSERT INTO {full_table_name_sql} ({columns_sql}) VALUES ({placeholders})"
     inserted_count = 0
 
-    for record in records:
-        values = [record.get(field_name) for field_name in avro_fields]
-        try:
-            cursor.execute(insert_sql, tuple(values))
-            inserted_count += 1
-        except pyodbc.Error as e:
-            db_conn.rollback()
+    # Records are streamed from the AVRO reader and inserted in batches. The
+    # existing rows are removed with DELETE (TRUNCATE is refused on tables
+    # referenced by a foreign key) and the backed-up ids are written back under
+    # IDENTITY_INSERT, so references from other tables keep pointing at the same
+    # rows. The delete and the inserts share one transaction: any failure rolls
+    # both back and leaves the table as it was. A table that hired_employees
+    # rows still reference cannot be cleared; its DELETE fails with a foreign
+    # key error and the restore returns 500 without changes.
+    try:
+        with checkout() as db_conn, open(local_avro_path, 'rb') as fo:
+            avro_reader = reader(fo)
+            first_record = next(avro_reader, None)
+            if first_record is None:
+                return ojsonify({"status": "warning", "message": "No records found in AVRO file, nothing restored."}, 200)
+
+            cursor = db_conn.cursor()
+            cursor.fast_executemany = True
+            cursor.execute(f"DELETE FROM {full_table_name_sql}")
+
+            # IDENTITY_INSERT is a session setting that survives the transaction,
+            # so it is always switched off before the connection goes back to the pool.
+            cursor.execute(f"SET IDENTITY_INSERT {full_table_name_sql} ON")
+            try:
+                batch = []
+                for record in chain((first_record,), avro_reader):
+                    batch.append(tuple(record.get(field_name) for field_name in avro_fields))
+                    if len(batch) >= RESTORE_BATCH_SIZE:
+                        cursor.executemany(insert_sql, batch)
+                        inserted_count += len(batch)
+                        batch = []
+                if batch:
+                    cursor.executemany(insert_sql, batch)
+                    inserted_count += len(batch)
+            finally:
+                cursor.execute(f"SET IDENTITY_INSERT {full_table_name_sql} OFF")
+            cursor.close()
 
-    db_conn.commit()
-    db_conn.close()
-    os.remove(local_avro_path)
+    except pyodbc.Error as e:
+        app.logger.error(f"Restore failed for table {table_name}: {e}", exc_info=True)
+        return ojsonify({
+            'error': 'An error occurred during table restoration.',
+            'details': str(e),
+            'code': 500
+        }, 500)
+    finally:
+        os.remove(local_avro_path)
 
-    return jsonify({
+    return ojsonify({
         'status': 1,
         'message': "Success",
         'data': [{
@@ -1,17 +1,20 @@
 python historical_loader.py \
     --file_name=jobs.csv \
+    --blob_prefix=jobs \
     --target_table_name=migration_tables.jobs \
     --target_columns='["id", "job"]' \
     --insert_columns='["job"]'
 
 python historical_loader.py \
     --file_name=hired_employees.csv \
+    --blob_prefix=hired_employees \
     --target_table_name=migration_tables.hired_employees \
     --target_columns='["id", "name", "datetime", "department_id", "job_id"]' \
     --insert_columns='["name", "datetime", "department_id", "job_id"]'
 
 python historical_loader.py \
     --file_name=departments.csv \
+    --blob_prefix=departments \
     --target_table_name=migration_tables.departments \
     --target_columns='["id", "department"]' \
     --insert_columns='["department"]'
\ No newline at end of file
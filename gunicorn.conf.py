@@ -0,0 +1,17 @@
+import os
+import multiprocessing
+
+# --- Gunicorn settings for serving the API ---
+# Usage: gunicorn -c gunicorn.conf.py app:app
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Several worker processes avoid a single GIL-bound server; each worker also
+# serves requests on several threads, since most request time is spent waiting
+# on SQL Server and Blob Storage. pyodbc and the Azure SDK release the GIL while
+# they wait, so every thread can keep its own query in flight using a
+# connection from the worker's pool (DB_POOL_SIZE, keep it >= threads).
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+timeout = 120
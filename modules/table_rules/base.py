@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from typing import Callable, NamedTuple, Optional
+
+
+class Rule(NamedTuple):
+    """
+    Validation rule for a single field of a table schema.
+
+    :param expected_type: The type the field value must be an instance of.
+    :param predicate: Optional extra check the field value must pass.
+    :param error: Message appended to the field name when the predicate fails.
+    """
+    expected_type: type
+    predicate: Optional[Callable[[object], bool]] = None
+    error: Optional[str] = None
+
+
+class SchemaValidator:
+    """
+    Validates a batch of rows against a table schema.
+
+    Subclasses only declare `insert_columns` and `schema` (field name -> Rule);
+    the expected key set and the per-field checks are resolved once, when the
+    subclass is defined, and every check is evaluated column-wise over the batch.
+    """
+    __slots__ = ('data',)
+
+    insert_columns: list = []
+    schema: dict = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._columns = list(cls.schema)
+        cls._expected_keys_set = frozenset(cls.schema)
+        cls._schema_items = tuple(cls.schema.items())
+        cls._checks = tuple(
+            (key, rule, lambda value, expected_type=rule.expected_type: isinstance(value, expected_type))
+            for key, rule in cls._schema_items
+        )
+
+    def __init__(self, data: list):
+        if not isinstance(data, list):
+            raise TypeError("The data must be a list of dictionaries.")
+
+        self.data = data
+
+    def validate_schema(self) -> tuple[list, list]:
+        """
+        Validates the rows against the schema.
+
+        :return: The accepted rows (as received) and the rejected rows with their reasons.
+        """
+        dict_rows, frame, accept_mask, rejected_rows = self._validate()
+        accepted_rows = [dict_rows[position] for position in np.flatnonzero(accept_mask)]
+        return accepted_rows, rejected_rows
+
+    def validate_for_insert(self) -> tuple[list, list]:
+        """
+        Validates the rows against the schema and returns the accepted ones as
+        parameter tuples in `insert_columns` order, ready for executemany.
+
+        The tuples are zipped from the already columnar validation frame, so the
+        accepted rows never go back through per-row dict lookups.
+
+        :return: The accepted parameter tuples and the rejected rows with their reasons.
+        """
+        dict_rows, frame, accept_mask, rejected_rows = self._validate()
+        insert_rows = list(frame.loc[accept_mask, self.insert_columns].itertuples(index=False, name=None))
+        return insert_rows, rejected_rows
+
+    def _validate(self):
+        rejected_rows = []
+
+        expected_keys_set = self._expected_keys_set
+
+        for index, row in enumerate(self.data):
+            if not isinstance(row, dict):
+                rejected_rows.append({
+                    "index": index,
+                    "row_data": row,
+                    "reason": [f"The row is not a dictionary, it is of type {type(row).__name__}."]
+                })
+
+        dict_indexes = [index for index, row in enumerate(self.data) if isinstance(row, dict)]
+        dict_rows = [self.data[index] for index in dict_indexes]
+
+        # Build one object-typed frame so every check runs column-wise while the
+        # original Python values (and their types) are preserved.
+        df = pd.DataFrame(dict_rows, columns=self._columns, dtype=object)
+
+        keys_ok = np.fromiter((row.keys() == expected_keys_set for row in dict_rows),
+                              dtype=bool, count=len(dict_rows))
+        types_ok = {key: df[key].map(type_check).to_numpy(dtype=bool) for key, _, type_check in self._checks}
+        accept_mask = np.logical_and.reduce([keys_ok, *types_ok.values()])
+
+        # Predicates (e.g. the datetime parse) first run on the rows that passed
+        # every cheap check. Their results are kept so the reasons below only
+        # evaluate a predicate for rows it never ran on; each row is parsed once.
+        predicates_ok = {}
+        predicates_ran = {}
+        for key, rule, _ in self._checks:
+            if rule.predicate is not None:
+                candidates = np.flatnonzero(accept_mask)
+                results = df[key].iloc[candidates].map(rule.predicate).to_numpy(dtype=bool)
+                predicates_ok[key] = np.zeros(len(dict_rows), dtype=bool)
+                predicates_ok[key][candidates] = results
+                predicates_ran[key] = np.zeros(len(dict_rows), dtype=bool)
+                predicates_ran[key][candidates] = True
+                accept_mask[candidates] = results
+
+        # Reasons are only spelled out for the (usually few) rejected rows.
+        for position in np.flatnonzero(~accept_mask):
+            row = dict_rows[position]
+            reasons = []
+
+            if not keys_ok[position]:
+                row_keys_set = set(row.keys())
+                missing_keys = expected_keys_set - row_keys_set
+                if missing_keys:
+                    reasons.append(f"The following keys are missing: {', '.join(sorted(missing_keys))}.")
+
+                extra_keys = row_keys_set - expected_keys_set
+                if extra_keys:
+                    reasons.append(f"Contains unexpected keys: {', '.join(sorted(extra_keys))}.")
+
+            for key, rule in self._schema_items:
+                if key not in row:
+                    continue
+
+                if not types_ok[key][position]:
+                    reasons.append(
+                        f"The field '{key}' has the type '{type(row[key]).__name__}', "
+                        f"'{rule.expected_type.__name__}' was expected."
+                    )
+
+                if key in predicates_ok:
+                    if predicates_ran[key][position]:
+                        predicate_ok = predicates_ok[key][position]
+                    else:
+                        predicate_ok = rule.predicate(row[key])
+                    if not predicate_ok:
+                        reasons.append(f"The field '{key}' {rule.error}.")
+
+            rejected_rows.append({
+                "index": dict_indexes[position],
+                "row_data": row,
+                "reason": reasons
+            })
+
+        rejected_rows.sort(key=lambda rejected_row: rejected_row["index"])
+
+        return dict_rows, df, accept_mask, rejected_rows
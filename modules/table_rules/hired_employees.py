@@ -1,95 +1,45 @@
-from datetime import datetime
+import re
+import ciso8601
 
+from modules.table_rules.base import Rule, SchemaValidator
 
-def is_iso_datetime(date_str: str) -> bool:
-    if not isinstance(date_str, str):
-        return False
-
-    try:
-        datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        return True
-    except ValueError:
-        pass
-
-    iso_formats = [
-        "%Y-%m-%dT%H:%M:%S.%fZ",   # With milliseconds and Z (UTC)
-        "%Y-%m-%dT%H:%M:%S%z",     # With seconds and time zone offset (e.g. +0100)
-        "%Y-%m-%dT%H:%M:%SZ",      # With seconds and Z (UTC)
-    ]
-
-    for fmt in iso_formats:
-        try:
-            datetime.strptime(date_str, fmt)
-            return True
-        except ValueError:
-            continue
-    return False
 
+# Fixed shape YYYY-MM-DDTHH:MM:SS with optional fractional seconds and a
+# Z / +HH:MM / +HHMM designator. A space is also accepted as separator.
+ISO_DATETIME_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?(?:Z|[+-]\d{2}:?\d{2})?",
+    re.ASCII
+)
 
-class HiredEmployees:
 
-    def __init__(self, data: list):
-        if not isinstance(data, list):
-            raise TypeError("The data must be a list of dictionaries.")
-        
-        self.data = data
-        self.insert_columns = ['name', 'datetime', 'department_id', 'job_id']
-        self.schema = {
-            'name': str,
-            'datetime': str,
-            'department_id': int,
-            'job_id': int
-        }
-    
-    def validate_schema(self) -> tuple[list, list]:
-        accepted_rows = []
-        rejected_rows = []
-
-        expected_keys_set = set(self.schema.keys())
+def is_iso_datetime(date_str: str) -> bool:
+    """
+    Checks whether a string is an ISO 8601 datetime.
 
-        for index, row in enumerate(self.data):
-            reasons = []
+    Malformed strings are rejected by a precompiled fixed-shape pattern without
+    raising any exception; only well-shaped strings reach ciso8601's C parser,
+    which validates the calendar values (month 13, February 30, ...).
 
-            if not isinstance(row, dict):
-                reasons.append(f"The row is not a dictionary, it is of type {type(row).__name__}.")
-                rejected_rows.append({"index": index, "row_data": row, "reason": reasons})
-                continue
+    :param date_str: The value to check.
+    :return: True if the value is a valid ISO 8601 datetime string, False otherwise.
+    """
+    if not isinstance(date_str, str) or ISO_DATETIME_PATTERN.fullmatch(date_str) is None:
+        return False
 
-            row_keys_set = set(row.keys())
+    try:
+        ciso8601.parse_datetime(date_str)
+        return True
+    except ValueError:
+        return False
 
-            if row_keys_set != expected_keys_set:
-                missing_keys = expected_keys_set - row_keys_set
-                if missing_keys:
-                    reasons.append(f"The following keys are missing: {', '.join(sorted(missing_keys))}.")
-                
-                extra_keys = row_keys_set - expected_keys_set
-                if extra_keys:
-                    reasons.append(f"Contains unexpected keys: {', '.join(sorted(extra_keys))}.")
-            
-            for key, expected_type in self.schema.items():
-                if key in row:
-                    if not isinstance(row[key], expected_type):
-                        reasons.append(
-                            f"The field '{key}' has the type '{type(row[key]).__name__}', "
-                            f"'{expected_type.__name__}' was expected."
-                        )
-                    
-                    if key == 'datetime' and expected_type is str:
-                        if not is_iso_datetime(row[key]):
-                            reasons.append(
-                                f"The field 'datetime' has an invalid ISO 8601 format."
-                            )
-                elif key not in row and key in expected_keys_set:
-                    pass
 
-            if reasons:
-                rejected_rows.append({
-                    "index": index,
-                    "row_data": row,
-                    "reason": reasons
-                })
-            else:
-                accepted_rows.append(row)
-        
-        return accepted_rows, rejected_rows
+class HiredEmployees(SchemaValidator):
+    __slots__ = ()
 
+    insert_columns = ['name', 'datetime', 'department_id', 'job_id']
+    schema = {
+        'name': Rule(str),
+        'datetime': Rule(str, is_iso_datetime, "has an invalid ISO 8601 format"),
+        'department_id': Rule(int),
+        'job_id': Rule(int)
+    }
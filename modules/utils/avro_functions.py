@@ -1,3 +1,50 @@
+_SCHEMAS = {
+    "departments": {
+        "type": "record",
+        "name": "Department",
+        "namespace": "migration_tables",
+        "fields": [
+            {"name": "id", "type": "int"},
+            {"name": "department", "type": "string"}
+        ]
+    },
+    "hired_employees": {
+        "type": "record",
+        "name": "HiredEmployee",
+        "namespace": "migration_tables",
+        "fields": [
+            {"name": "id", "type": "int"},
+            {"name": "name", "type": ["null", "string"]},
+            {"name": "datetime", "type": ["null", "string"]},
+            {"name": "department_id", "type": ["null", "int"]},
+            {"name": "job_id", "type": ["null", "int"]}
+        ]
+    },
+    "jobs": {
+        "type": "record",
+        "name": "Job",
+        "namespace": "migration_tables",
+        "fields": [
+            {"name": "id", "type": "int"},
+            {"name": "job", "type": "string"}
+        ]
+    }
+}
+
+# Columns restored from a backup, in AVRO field order. The id column is included:
+# restores write the backed-up ids back under IDENTITY_INSERT so foreign keys
+# between the tables still match.
+_AVRO_FIELDS = {
+    table_name: tuple(field['name'] for field in schema['fields'])
+    for table_name, schema in _SCHEMAS.items()
+}
+
+_INSERT_SQL_BY_TABLE = {
+    table_name: f"INSERT INTO migration_tables.{table_name} ({', '.join(fields)}) VALUES ({', '.join(['?'] * len(fields))})"
+    for table_name, fields in _AVRO_FIELDS.items()
+}
+
+
 def get_avro_schema_for_table(table_name):
     """
     Returns the predefined AVRO schema for a given table name.
@@ -5,36 +52,23 @@ def get_avro_schema_for_table(table_name):
 
     :param table_name: Name of the table you want to get the schema for
     """
-    schemas = {
-        "departments": {
-            "type": "record",
-            "name": "Department",
-            "namespace": "migration_tables",
-            "fields": [
-                {"name": "id", "type": "int"},
-                {"name": "department", "type": "string"}
-            ]
-        },
-        "hired_employees": {
-            "type": "record",
-            "name": "HiredEmployee",
-            "namespace": "migration_tables",
-            "fields": [
-                {"name": "id", "type": "int"},
-                {"name": "name", "type": ["null", "string"]},
-                {"name": "datetime", "type": ["null", "string"]},
-                {"name": "department_id", "type": ["null", "int"]},
-                {"name": "job_id", "type": ["null", "int"]}
-            ]
-        },
-        "jobs": {
-            "type": "record",
-            "name": "Job",
-            "namespace": "migration_tables",
-            "fields": [
-                {"name": "id", "type": "int"},
-                {"name": "job", "type": "string"}
-            ]
-        }
-    }
-    return schemas.get(table_name)
\ No newline at end of file
+    return _SCHEMAS.get(table_name)
+
+
+def get_avro_fields_for_table(table_name):
+    """
+    Returns the AVRO field names restored into a given table, including the id column.
+
+    :param table_name: Name of the table you want to get the fields for
+    """
+    return _AVRO_FIELDS.get(table_name)
+
+
+def get_avro_insert_sql_for_table(table_name):
+    """
+    Returns the parameterized INSERT statement used to restore a given table
+    from its AVRO backup.
+
+    :param table_name: Name of the table you want to get the statement for
+    """
+    return _INSERT_SQL_BY_TABLE.get(table_name)
@@ -16,14 +16,22 @@ load_dotenv(CONNECTION_PATH)
 BLOB_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 BLOB_CONTAINER_NAME = os.getenv("BLOB_CONTAINER_NAME_HISTORIC")
 
+# Shared client, created on first use so its HTTP connection pool is reused
+# across requests.
+_BLOB_SERVICE_CLIENT = None
+
 
 def get_blob_service_client():
     """
-    Establishes and returns an Azure Blob Storage service client.
+    Returns the process-wide Azure Blob Storage service client, creating it on
+    the first call.
 
     This client is used to interact with Azure Blob Storage, allowing operations
     such as listing containers, uploading blobs, and downloading blobs.
 
     :return: An instance of BlobServiceClient connected to Azure Blob Storage.
     """
-    return BlobServiceClient.from_connection_string(BLOB_CONNECTION_STRING)
\ No newline at end of file
+    global _BLOB_SERVICE_CLIENT
+    if _BLOB_SERVICE_CLIENT is None:
+        _BLOB_SERVICE_CLIENT = BlobServiceClient.from_connection_string(BLOB_CONNECTION_STRING)
+    return _BLOB_SERVICE_CLIENT
@@ -1,7 +1,10 @@
 import os
+import time
+import queue
 import pyodbc
 
 from pathlib import Path
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 # --- Configuration and Environment Variables ---
@@ -18,30 +21,105 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_PORT = os.getenv("DB_PORT", "1433")
 
+# The connection string only depends on the environment, so it is built once.
+CONNECTION_STRING = (
+    f"DRIVER={{ODBC Driver 18 for SQL Server}};"
+    f"SERVER={DB_SERVER};"
+    f"DATABASE={DB_NAME};"
+    f"UID={DB_USER};"
+    f"PWD={DB_PASSWORD};"
+    "Encrypt=yes;"
+    "TrustServerCertificate=no;"
+    "Connection Timeout=30;"
+)
 
-def get_sql_server_connection():
+# --- Connection Pool ---
+# Idle connections are kept here and reused across requests, so the ODBC login
+# handshake is only paid when the pool is empty. The pool is shared by all the
+# request threads of a server worker, so it should hold at least one connection
+# per thread.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+_POOL = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+# Connections idle for longer than this many seconds are pinged before reuse;
+# recently used ones are handed out directly, without an extra round trip.
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "60"))
+
+
+def _is_alive(conn):
+    """
+    Checks that a pooled connection still reaches the server. Azure SQL drops
+    sessions that stay idle, so a connection can go stale while in the pool.
+
+    :param conn: A pyodbc connection taken from the pool.
+    :return: True if a trivial query succeeds, False otherwise.
+    """
+    try:
+        conn.execute("SELECT 1").fetchone()
+        return True
+    except pyodbc.Error:
+        return False
+
+
+def _acquire_connection():
+    """
+    Takes an idle connection from the pool, or opens a new one with autocommit
+    set to False when the pool is empty. Pooled connections that sat idle for
+    longer than DB_POOL_PING_AFTER seconds and fail the ping are discarded.
+
+    :return: A pyodbc connection object.
+    """
+    while True:
+        try:
+            conn, released_at = _POOL.get_nowait()
+        except queue.Empty:
+            return pyodbc.connect(CONNECTION_STRING, autocommit=False)
+        if time.monotonic() - released_at < DB_POOL_PING_AFTER or _is_alive(conn):
+            return conn
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+
+def release_sql_server_connection(conn):
+    """
+    Returns a connection to the pool so later requests can reuse it. Any open
+    transaction is rolled back first and the release time is recorded, so the
+    connection is only pinged if it stays idle too long. The connection is
+    closed if the pool is already full or the connection is no longer usable.
+
+    :param conn: A pyodbc connection taken from the pool by _acquire_connection.
+    """
+    try:
+        conn.rollback()
+        _POOL.put_nowait((conn, time.monotonic()))
+    except (queue.Full, pyodbc.Error):
+        conn.close()
+
+
+@contextmanager
+def checkout():
     """
-    Establishes and returns a connection to the SQL Server database.
+    Lends a pooled connection for the duration of a with block.
 
-    The connection string is built using environment variables to ensure secure
-    and flexible database access. Autocommit is set too False to allow for explicit
-    transaction management (commit/rollback).
+    The transaction is committed when the block completes, rolled back if it
+    raises, and the connection is always returned to the pool afterwards.
 
-    :return: A pyodbc connection object if successful, None otherwise.
+    :return: A pyodbc connection object.
+    :raises pyodbc.Error: If no connection to the database can be established.
     """
+    conn = _acquire_connection()
     try:
-        conn_str = (
-            f"DRIVER={{ODBC Driver 18 for SQL Server}};"
-            f"SERVER={DB_SERVER};"
-            f"DATABASE={DB_NAME};"
-            f"UID={DB_USER};"
-            f"PWD={DB_PASSWORD};"
-            "Encrypt=yes;"
-            "TrustServerCertificate=no;"
-            "Connection Timeout=30;"
-        )
-        conn = pyodbc.connect(conn_str)
-        conn.autocommit = False
-        return conn
-    except Exception as e:
-        return None
\ No newline at end of file
+        yield conn
+        conn.commit()
+    except BaseException:
+        # The connection may be dead; never let a failed rollback mask the
+        # original error.
+        try:
+            conn.rollback()
+        except pyodbc.Error:
+            pass
+        raise
+    finally:
+        release_sql_server_connection(conn)
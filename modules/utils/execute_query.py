@@ -1,55 +1,78 @@
 import os
 import pyodbc
+import logging
 
 from pathlib import Path
+from functools import lru_cache
+
+QUERIES_FOLDER = os.path.join(Path(__file__).parents[2], 'queries')
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=128)
+def _load_template(query_name):
+    """
+    Reads a SQL file from the queries folder. The contents are cached, so each
+    file is only read from disk once per process.
+
+    :param query_name: The name of the SQL file (without the .sql extension).
+    :returns: The SQL text of the file.
+    """
+    with open(os.path.join(QUERIES_FOLDER, f"{query_name}.sql")) as file:
+        return file.read()
+
 
 def execute_query(query_name, year, db_conn):
     """
     Executes a parameterized SQL query stored in an external .sql file,
-    dynamically substituting a year placeholder before execution. Includes
-    robust error handling with logging.
+    binding the year to every '?' placeholder so SQL Server can reuse one
+    cached plan for all years. Includes robust error handling with logging.
 
     :param query_name: The name of the SQL file to execute (without the .sql extension).
-    :param year: The year value to be inserted into the SQL query.
+    :param year: The year value bound to the query's '?' placeholders.
     :param db_conn: An already established and open SQL Server database connection object.
 
     :returns: A list of tuples containing the fetched results if the query is a SELECT statement.
+    :raises FileNotFoundError: If the SQL file does not exist.
+    :raises pyodbc.Error: If the query fails; the transaction is rolled back first.
     """
     results = []
     cursor = None
-    
-    try:
-        queries_folder = os.path.join(Path(__file__).parents[2], 'queries')
-        file_path = open(os.path.join(queries_folder, f"{query_name}.sql"))
 
-        file = open(os.path.join(queries_folder, f"{query_name}.sql"))
-        query = file.read().replace("{year}", f"{year}")
+    try:
+        query = _load_template(query_name)
 
-        # Execute the query.
+        # Execute the query, binding the year to each placeholder.
         cursor = db_conn.cursor()
-        cursor.execute(query)
-        results = cursor.fetchall() 
-        db_conn.commit()
+        cursor.arraysize = 1000
+        cursor.execute(query, (year,) * query.count('?'))
+
+        # Only statements without a result set need to be committed.
+        if cursor.description:
+            results = cursor.fetchall()
+        else:
+            db_conn.commit()
 
+    except FileNotFoundError as e:
+        message = f"SQL file '{query_name}.sql' not found at '{QUERIES_FOLDER}'."
+        logger.error(message)
+        raise FileNotFoundError(message) from e
     except pyodbc.Error as ex:
         sqlstate = ex.args[0]
-        print(f"Database error executing query '{query_name}.sql' for year {year}. SQLSTATE: {sqlstate}, Error: {ex}")
+        logger.exception(f"Database error executing query '{query_name}.sql' for year {year}. SQLSTATE: {sqlstate}")
         if db_conn:
             db_conn.rollback()
-            print(f"Transaction for query '{query_name}.sql' has been rolled back.")
-        raise ex
-    except FileNotFoundError:
-        raise f"Error: SQL file '{query_name}.sql' not found at '{file_path}'."
-    except Exception as e:
-        print(f"An unexpected error occurred while executing query '{query_name}.sql' for year {year}: {e}")
+            logger.info(f"Transaction for query '{query_name}.sql' has been rolled back.")
+        raise
+    except Exception:
+        logger.exception(f"An unexpected error occurred while executing query '{query_name}.sql' for year {year}.")
         if db_conn:
             db_conn.rollback()
-            print(f"Transaction for query '{query_name}.sql' has been rolled back due to an unexpected error.")
-        raise e
+            logger.info(f"Transaction for query '{query_name}.sql' has been rolled back due to an unexpected error.")
+        raise
     finally:
         if cursor:
             cursor.close()
-            print(f"Cursor for query '{query_name}.sql' closed.")
-            
+
     return results
-    
\ No newline at end of file
@@ -8,6 +8,6 @@ SELECT
 FROM migration_tables.hired_employees h
 LEFT JOIN migration_tables.departments d ON d.id = h.department_id
 LEFT JOIN migration_tables.jobs j ON j.id = h.job_id
-WHERE YEAR(h.datetime) = {year} AND h.datetime IS NOT NULL
+WHERE YEAR(h.datetime) = ? AND h.datetime IS NOT NULL
 GROUP BY d.department, j.job
 ORDER BY d.department, j.job;
\ No newline at end of file
@@ -22,6 +22,6 @@ FROM
 GROUP BY
     id, department
 HAVING
-    SUM(hired) > (SELECT AVG(hired) FROM Hirings WHERE year_hired = {year})
+    SUM(hired) > (SELECT AVG(hired) FROM Hirings WHERE year_hired = ?)
 ORDER BY
     SUM(hired) DESC;
\ No newline at end of file
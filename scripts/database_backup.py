@@ -1,13 +1,25 @@
+import io
 import os
 import pyodbc
 import logging
 import datetime
 
 from pathlib import Path
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from fastavro import writer, parse_schema
 from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
 
+# Optional Arrow fetch backend: when turbodbc (built with Arrow support) is
+# installed, exports fetch columnar Arrow batches instead of Python tuples.
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import turbodbc
+except ImportError:
+    turbodbc = None
+
 # --- Configuration and Environment Variables ---
 CONNECTION_PATH = os.path.join(Path(__file__).parents[1], 'config', 'connections.env')
 
@@ -55,21 +67,38 @@ if not all([BLOB_CONNECTION_STRING, BLOB_CONTAINER_NAME, DB_SERVER, DB_NAME, DB_
     logger.error("Required: AZURE_STORAGE_CONNECTION_STRING, BLOB_CONTAINER_NAME_HISTORIC, DB_SERVER, DB_NAME, DB_USER, DB_PASSWORD")
     exit(1)
 
+# Number of rows pulled from SQL Server per fetch during an export.
+FETCH_ARRAY_SIZE = 5000
+
+# Approximate size in bytes of each AVRO data block flushed by the writer.
+AVRO_SYNC_INTERVAL = 1 << 16
+
+# Number of parallel block uploads used when sending a backup to Blob Storage.
+BLOB_UPLOAD_CONCURRENCY = 8
+
+# Shared BlobServiceClient, created on first use and reused by every export.
+_BLOB_SERVICE_CLIENT = None
+
 
 def get_blob_service_client():
     """
     Establishes and returns an Azure Blob Storage service client.
 
     This client is used to interact with Azure Blob Storage, allowing operations
-    such as listing containers, uploading blobs, and downloading blobs.
+    such as listing containers, uploading blobs, and downloading blobs. The client
+    is created once and cached, so every export shares its connection pool.
 
     :return: An instance of BlobServiceClient connected to Azure Blob Storage.
     """
+    global _BLOB_SERVICE_CLIENT
+    if _BLOB_SERVICE_CLIENT is not None:
+        return _BLOB_SERVICE_CLIENT
+
     logger.info("Attempting to get Azure Blob Storage service client...")
     try:
-        client = BlobServiceClient.from_connection_string(BLOB_CONNECTION_STRING)
+        _BLOB_SERVICE_CLIENT = BlobServiceClient.from_connection_string(BLOB_CONNECTION_STRING)
         logger.info("Successfully obtained BlobServiceClient.")
-        return client
+        return _BLOB_SERVICE_CLIENT
     except Exception as e:
         logger.error(f"Failed to get BlobServiceClient: {e}", exc_info=True)
         return None
@@ -81,9 +110,10 @@ def get_sql_server_connection():
 
     The connection string is built using environment variables to ensure secure
     and flexible database access. Autocommit is set too False to allow for explicit
-    transaction management (commit/rollback).
+    transaction management (commit/rollback). If turbodbc is installed the connection
+    is opened through it, so result sets can be fetched as Arrow batches.
 
-    :return: A pyodbc connection object if successful, None otherwise.
+    :return: A pyodbc or turbodbc connection object if successful, None otherwise.
     """
     try:
         conn_str = (
@@ -96,8 +126,16 @@ def get_sql_server_connection():
             "TrustServerCertificate=no;"
             "Connection Timeout=30;"
         )
-        conn = pyodbc.connect(conn_str)
-        conn.autocommit = False
+        if turbodbc is not None:
+            options = turbodbc.make_options(
+                read_buffer_size=turbodbc.Rows(FETCH_ARRAY_SIZE),
+                prefer_unicode=True,
+                use_async_io=True,
+                autocommit=False)
+            conn = turbodbc.connect(connection_string=conn_str, turbodbc_options=options)
+        else:
+            conn = pyodbc.connect(conn_str)
+            conn.autocommit = False
         logger.info("Successfully connected to SQL Server.")
         return conn
     except Exception as e:
@@ -105,23 +143,121 @@ def get_sql_server_connection():
         return None
 
 
-def export_table_to_avro(table_full_name, schema, container_name):
+def to_epoch_millis(value):
+    """
+    Converts a datetime into milliseconds since the Unix epoch.
+
+    SQL Server datetimes are naive and are read as UTC, matching the Arrow
+    backend, so the result does not depend on the host's time zone.
+
+    :param value: A datetime.datetime instance.
+    :return: The timestamp in milliseconds as an int.
+    """
+    return int(value.replace(tzinfo=datetime.timezone.utc).timestamp() * 1000)
+
+
+def decode_utf8(value):
+    """
+    Decodes a bytes value as UTF-8 text.
+
+    :param value: A bytes or bytearray instance.
+    :return: The decoded string.
+    """
+    return value.decode('utf-8')
+
+
+def pick_converter(column_description):
+    """
+    Picks the AVRO converter for a result set column from its cursor description.
+
+    :param column_description: One entry of cursor.description.
+    :return: The function converting non-null values of the column, or None if
+             the values can be written as they are.
+    """
+    type_code = column_description[1]
+    if type_code in (bytes, bytearray):
+        return decode_utf8
+    if type_code is datetime.datetime:
+        return to_epoch_millis
+    return None
+
+
+def convert_column(values, converter):
+    """
+    Converts one fetched column into AVRO-compatible values.
+
+    :param values: A sequence with the values of a single column.
+    :param converter: The converter picked for the column, or None.
+    :return: The converted values, or the input unchanged if no conversion is needed.
+    """
+    if converter is None:
+        return values
+    return [converter(val) if val is not None else None for val in values]
+
+
+def iter_records(cursor, field_names, converters, rows):
+    """
+    Yields the AVRO records of a result set, fetching it block by block.
+
+    Each block of arraysize rows is transposed into columns, converted column
+    by column and zipped back into records as the AVRO writer consumes them.
+
+    :param cursor: The pyodbc cursor holding the result set.
+    :param field_names: The lower-cased column names used as record keys.
+    :param converters: The converter picked for each column, or None.
+    :param rows: The first block of rows, already fetched.
+    """
+    while rows:
+        column_values = [convert_column(values, converter)
+                         for values, converter in zip(zip(*rows), converters)]
+        for values in zip(*column_values):
+            yield dict(zip(field_names, values))
+        rows = cursor.fetchmany(cursor.arraysize)
+
+
+def arrow_table_to_records(table):
+    """
+    Converts an Arrow table fetched by turbodbc into AVRO records.
+
+    Conversions run as Arrow compute kernels over whole columns: binary columns
+    are cast to UTF-8 strings and timestamps to epoch milliseconds.
+
+    :param table: A pyarrow.Table with one batch of the result set.
+    :return: A list with one dict per row, keyed by the lower-cased column names.
+    """
+    columns = []
+    for column in table.columns:
+        if pa.types.is_binary(column.type):
+            column = pc.cast(column, pa.string())
+        elif pa.types.is_timestamp(column.type):
+            column = pc.cast(pc.cast(column, pa.timestamp('ms'), safe=False), pa.int64())
+        columns.append(column)
+    return pa.table(columns, names=[name.lower() for name in table.column_names]).to_pylist()
+
+
+def iter_arrow_records(tables):
+    """
+    Yields the AVRO records of a result set fetched as Arrow batches.
+
+    :param tables: An iterable of pyarrow.Table batches from fetcharrowbatches.
+    """
+    for table in tables:
+        yield from arrow_table_to_records(table)
+
+
+def export_table_to_avro(table_full_name, schema, container_name, blob_service_client):
     """
     Exports data from a specified SQL table to AVRO format and uploads it to Azure Blob Storage.
 
     :param table_full_name: The full name of the table.
     :param schema: The AVRO schema for the table data.
     :param container_name: The name of the Azure Blob Storage container.
+    :param blob_service_client: The shared BlobServiceClient used for the upload.
     """
     logger.info(f"Starting export process for table: {table_full_name}")
     avro_schema = parse_schema(schema)
     dataset_name, table_name = table_full_name.split('.')
 
-    blob_service_client = get_blob_service_client()
-    if not blob_service_client:
-        logger.error("BlobServiceClient not available. Aborting export.")
-        return
-
     db_conn = get_sql_server_connection()
     if not db_conn:
         logger.error("Could not connect to the database. Aborting export.")
@@ -129,51 +265,44 @@ def export_table_to_avro(table_full_name, schema, container_name):
 
     avro_file_name = f'{table_name}_{datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S")}.avro'
 
-    temp_dir = os.path.join(Path(__file__).parents[1], 'tmp')
-    if not os.path.exists(temp_dir):
-        logger.info(f"Creating temporary directory: {temp_dir}")
-        os.makedirs(temp_dir, exist_ok=True)
-    else:
-        logger.info(f"Temporary directory already exists: {temp_dir}")
-
-    local_avro_path = os.path.join(temp_dir, avro_file_name)
     cursor = None
     try:
         cursor = db_conn.cursor()
         logger.info(f"Executing query: SELECT * FROM {dataset_name}.{table_name}")
         cursor.execute(f"SELECT * FROM [{dataset_name}].[{table_name}]")
-        records = []
-        columns = [column[0] for column in cursor.description]
-
-        for row in cursor:
-            record = {}
-            for i, col_name in enumerate(columns):
-                val = row[i]
-                if isinstance(val, (bytes, bytearray)):
-                    val = val.decode('utf-8')
-                elif val is None: 
-                    pass
-                elif isinstance(val, datetime.datetime):
-                    val = int(val.timestamp() * 1000)
-                record[col_name.lower()] = val
-            records.append(record)
-
-        logger.info(f"Extracted {len(records)} records from {table_full_name}.")
-
-        if not records:
-            logger.warning("No records found to export. Skipping AVRO file creation and upload.")
-            return
-
-        logger.info(f"Writing {len(records)} records to local AVRO file: {local_avro_path}")
-        with open(local_avro_path, 'wb') as out_file:
-            writer(out_file, avro_schema, records)
-        logger.info("Local AVRO file created successfully.")
+
+        if turbodbc is not None:
+            # Cell values stay in Arrow buffers until the final per-batch to_pylist.
+            tables = cursor.fetcharrowbatches()
+            first_table = next(tables, None)
+            if first_table is None or first_table.num_rows == 0:
+                logger.warning("No records found to export. Skipping AVRO file creation and upload.")
+                return
+            records = iter_arrow_records(chain([first_table], tables))
+        else:
+            cursor.arraysize = FETCH_ARRAY_SIZE
+            field_names = [column[0].lower() for column in cursor.description]
+            converters = [pick_converter(column) for column in cursor.description]
+
+            rows = cursor.fetchmany(cursor.arraysize)
+            if not rows:
+                logger.warning("No records found to export. Skipping AVRO file creation and upload.")
+                return
+            records = iter_records(cursor, field_names, converters, rows)
+
+        # Serialize in memory so the AVRO bytes go straight to Blob Storage
+        # without a round-trip through a local temporary file. Records are
+        # streamed from the cursor, so only one fetch block is held at a time.
+        logger.info("Writing records to in-memory AVRO buffer.")
+        avro_buffer = io.BytesIO()
+        writer(avro_buffer, avro_schema, records, codec='null', sync_interval=AVRO_SYNC_INTERVAL)
+        logger.info(f"AVRO buffer for {table_full_name} created successfully ({avro_buffer.tell()} bytes).")
+        avro_buffer.seek(0)
 
         logger.info(f"Uploading AVRO file '{avro_file_name}' to Blob Storage container '{container_name}'...")
         container_client = blob_service_client.get_container_client(container_name)
         blob_client = container_client.get_blob_client(f"{dataset_name}/{table_name}/{avro_file_name}")
-        with open(local_avro_path, "rb") as data:
-            blob_client.upload_blob(data, overwrite=True)
+        blob_client.upload_blob(avro_buffer, overwrite=True, max_concurrency=BLOB_UPLOAD_CONCURRENCY)
         logger.info(f"Successfully uploaded {avro_file_name} to {container_name}/{dataset_name}/{table_name}/ in Blob Storage.")
 
     except pyodbc.Error as ex:
@@ -188,14 +317,17 @@ def export_table_to_avro(table_full_name, schema, container_name):
         if db_conn:
             db_conn.close()
             logger.info("SQL connection closed.")
-        if os.path.exists(local_avro_path):
-            os.remove(local_avro_path)
-            logger.info(f"Local temporary file '{local_avro_path}' deleted.")
 
 
 def main():
     logger.info("--- Starting main export process ---")
-    table_name_jobs = "migration_tables.jobs"
+    container_name_backup = "backup"
+
+    blob_service_client = get_blob_service_client()
+    if not blob_service_client:
+        logger.error("BlobServiceClient not available. Aborting export.")
+        return
+
     schema_jobs = {
         "type": "record",
         "name": "Job",
@@ -205,11 +337,6 @@ def main():
             {"name": "job", "type": "string"}
         ]
     }
-    container_name_backup = "backup"
-
-    export_table_to_avro(table_full_name=table_name_jobs, schema=schema_jobs, container_name=container_name_backup)
-
-    table_name_departments = "migration_tables.departments"
     schema_departments = {
         "type": "record",
         "name": "Department",
@@ -219,9 +346,6 @@ def main():
             {"name": "department", "type": "string"}
         ]
     }
-    export_table_to_avro(table_full_name=table_name_departments, schema=schema_departments, container_name=container_name_backup)
-
-    table_name_employees = "migration_tables.hired_employees"
     schema_employees = {
         "type": "record",
         "name": "HiredEmployee",
@@ -234,7 +358,20 @@ def main():
             {"name": "job_id", "type": ["null", "int"]}
         ]
     }
-    export_table_to_avro(table_full_name=table_name_employees, schema=schema_employees, container_name=container_name_backup)
+
+    export_tasks = [
+        {"table_full_name": "migration_tables.jobs", "schema": schema_jobs, "container_name": container_name_backup},
+        {"table_full_name": "migration_tables.departments", "schema": schema_departments, "container_name": container_name_backup},
+        {"table_full_name": "migration_tables.hired_employees", "schema": schema_employees, "container_name": container_name_backup},
+    ]
+
+    # The exports are independent and network-bound, so run them concurrently.
+    # The BlobServiceClient is thread-safe and shared; each export opens its own
+    # database connection inside its thread.
+    with ThreadPoolExecutor(max_workers=len(export_tasks)) as executor:
+        list(executor.map(
+            lambda task: export_table_to_avro(**task, blob_service_client=blob_service_client),
+            export_tasks))
 
     logger.info("--- Export process completed ---")
 
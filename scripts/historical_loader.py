@@ -2,11 +2,14 @@ import os
 import io
 import json
 import pyodbc
+import uuid
 import logging
+import threading
 import argparse
 import pandas as pd
 
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from azure.storage.blob import BlobServiceClient
 
@@ -31,10 +34,41 @@ if not rejected_rows_logger.handlers:
     rejected_rows_logger.addHandler(file_handler)
     rejected_rows_logger.setLevel(logging.WARNING)
 
+# Number of rows sent to SQL Server per executemany call.
+INSERT_CHUNK_SIZE = 10000
+
+# Set FAST_EXECUTEMANY=false for ODBC drivers that do not handle pyodbc's
+# fast_executemany; inserts then fall back to multi-row VALUES statements.
+USE_FAST_EXECUTEMANY = os.getenv("FAST_EXECUTEMANY", "true").lower() == "true"
+
+# SQL Server accepts at most 2100 parameters per statement and 1000 rows per
+# VALUES list; multi-row statements stay under both limits.
+MAX_STATEMENT_PARAMETERS = 2000
+MAX_VALUES_ROWS = 1000
+
+# Maximum number of CSV files downloaded and ingested at the same time.
+LOADER_WORKERS = 8
+
+# Number of parallel ranged requests used to download a single blob.
+BLOB_DOWNLOAD_CONCURRENCY = 4
+
 # --- Azure Blob Storage Credentials ---
 BLOB_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 BLOB_CONTAINER_NAME = os.getenv("BLOB_CONTAINER_NAME_HISTORIC")
 
+# --- Optional BULK INSERT Path ---
+# When BULK_DATA_SOURCE names an external data source pointing at the staging
+# container (see DDL/bulk_data_source.sql), the cleaned rows are staged there
+# as a CSV blob and loaded by SQL Server with BULK INSERT instead of pyodbc.
+BULK_DATA_SOURCE = os.getenv("BULK_DATA_SOURCE")
+BLOB_CONTAINER_NAME_STAGING = os.getenv("BLOB_CONTAINER_NAME_STAGING", "staging")
+BULK_INSERT_BATCH_SIZE = 50000
+
+# Connection and cursor of each loader thread, reused across the files it ingests.
+_THREAD_STATE = threading.local()
+_OPEN_CONNECTIONS = []
+_OPEN_CONNECTIONS_LOCK = threading.Lock()
+
 # --- Database Credentials ---
 DB_SERVER = os.getenv("DB_SERVER")
 DB_NAME = os.getenv("DB_NAME")
@@ -91,17 +125,143 @@ def get_sql_server_connection():
         logger.error(f"Failed to connect to the database: {e}", exc_info=True)
         return None
 
+def get_thread_cursor():
+    """
+    Returns the SQL Server connection and insert cursor of the calling thread.
+
+    Both are created on the thread's first call and reused for every file it
+    ingests afterwards, so the INSERT statement stays prepared on the cursor
+    across files. fast_executemany is enabled once here when available.
+
+    :return: A (connection, cursor) tuple, or (None, None) if the connection fails.
+    """
+    cursor = getattr(_THREAD_STATE, 'cursor', None)
+    if cursor is not None:
+        return _THREAD_STATE.db_conn, cursor
+
+    db_conn = get_sql_server_connection()
+    if not db_conn:
+        return None, None
+
+    cursor = db_conn.cursor()
+    if USE_FAST_EXECUTEMANY:
+        try:
+            cursor.fast_executemany = True
+        except AttributeError:
+            logger.warning("fast_executemany is not supported by this pyodbc version; "
+                           "falling back to multi-row VALUES inserts.")
+
+    _THREAD_STATE.db_conn = db_conn
+    _THREAD_STATE.cursor = cursor
+    with _OPEN_CONNECTIONS_LOCK:
+        _OPEN_CONNECTIONS.append((db_conn, cursor))
+    return db_conn, cursor
+
+def close_thread_connections():
+    """
+    Closes the cursors and connections opened by the loader's worker threads.
+    """
+    with _OPEN_CONNECTIONS_LOCK:
+        for db_conn, cursor in _OPEN_CONNECTIONS:
+            cursor.close()
+            db_conn.close()
+        _OPEN_CONNECTIONS.clear()
+    logger.info("Connections to SQL Server closed.")
+
+def log_rejected_rows(df_rejected: pd.DataFrame):
+    """
+    Appends the rejected rows to the rejected rows log, one JSON object per line.
+
+    The rejected frame is converted to JSON Lines with one vectorized to_json
+    call and appended to the log file in a single write, rather than emitting
+    one logging record per discarded row.
+
+    :param df_rejected: DataFrame with the rows discarded during ingestion.
+    """
+    rejected_rows_handler = rejected_rows_logger.handlers[0]
+    record = rejected_rows_logger.makeRecord(
+        rejected_rows_logger.name, logging.WARNING, __file__, 0, "\0", None, None)
+    # The formatted placeholder record splits into the text that goes before
+    # and after each JSON line, so the log keeps the formatter's layout.
+    prefix, suffix = rejected_rows_handler.format(record).split("\0", 1)
+    terminator = rejected_rows_handler.terminator
+    payload = df_rejected.astype(str).to_json(orient='records', lines=True)
+    payload = ''.join(f"{prefix}{line}{suffix}{terminator}" for line in payload.splitlines())
+
+    rejected_rows_handler.acquire()
+    try:
+        rejected_rows_handler.stream.write(payload)
+        rejected_rows_handler.flush()
+    except Exception:
+        rejected_rows_handler.handleError(record)
+    finally:
+        rejected_rows_handler.release()
+
+def insert_multi_values(cursor, table_name: str, insert_columns: list, rows: list):
+    """
+    Inserts rows with multi-row 'INSERT ... VALUES (?, ...), (?, ...)' statements.
+
+    Used when fast_executemany is not available, so each statement still carries
+    as many rows as SQL Server's parameter and row limits allow instead of
+    sending one round-trip per row.
+
+    :param cursor: An open pyodbc cursor.
+    :param table_name: The name of the target table in the database.
+    :param insert_columns: A list of column names to be inserted into the database table.
+    :param rows: The row tuples to insert, in insert_columns order.
+    """
+    chunk_size = max(1, min(MAX_VALUES_ROWS, MAX_STATEMENT_PARAMETERS // len(insert_columns)))
+    row_placeholders = f"({', '.join(['?' for _ in insert_columns])})"
+    insert_prefix = f"INSERT INTO {table_name} ({', '.join(insert_columns)}) VALUES "
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        insert_sql = insert_prefix + ', '.join([row_placeholders] * len(chunk))
+        cursor.execute(insert_sql, [value for row in chunk for value in row])
+
+def bulk_insert_from_blob(staging_container_client, cursor, table_name: str, df_clean: pd.DataFrame):
+    """
+    Stages the cleaned rows as a CSV blob and loads them with BULK INSERT.
+
+    The frame must hold every column of the table in table order; values of an
+    IDENTITY column are ignored by BULK INSERT and generated by the server, the
+    same as with the INSERT path. CHECK_CONSTRAINTS makes the load enforce the
+    table's FOREIGN KEY and CHECK constraints like the INSERT path does and
+    keeps them trusted. The staging blob is deleted afterwards.
+
+    :param staging_container_client: The ContainerClient of the staging container
+                                     behind BULK_DATA_SOURCE.
+    :param cursor: An open pyodbc cursor.
+    :param table_name: The name of the target table in the database.
+    :param df_clean: DataFrame with the validated rows, in table column order.
+    """
+    staging_blob_name = f"{table_name}/{uuid.uuid4().hex}.csv"
+    blob_client = staging_container_client.get_blob_client(staging_blob_name)
+    csv_content = df_clean.to_csv(index=False, header=False, lineterminator='\n').encode('utf-8')
+    blob_client.upload_blob(csv_content, overwrite=True)
+
+    try:
+        cursor.execute(
+            f"BULK INSERT {table_name} FROM '{staging_blob_name}' "
+            f"WITH (DATA_SOURCE = '{BULK_DATA_SOURCE}', FORMAT = 'CSV', FIELDQUOTE = '\"', "
+            f"ROWTERMINATOR = '0x0a', CODEPAGE = '65001', CHECK_CONSTRAINTS, TABLOCK, "
+            f"BATCHSIZE = {BULK_INSERT_BATCH_SIZE})")
+    finally:
+        blob_client.delete_blob()
+
 def ingest_csv_to_db(
         csv_file_content: bytes,
-        db_conn, table_name: str,
+        db_conn, cursor, table_name: str,
         target_columns: list,
-        insert_columns: list) -> int:
+        insert_columns: list,
+        insert_sql: str,
+        staging_container_client=None) -> int:
     """
     Reads the contents of a CSV file, processes it, and inserts valid rows into
     the specified SQL Server table.
 
     This function performs the following steps:
-    1. Decodes the CSV content and reads it into a pandas DataFrame.
+    1. Reads the CSV bytes into a pandas DataFrame with explicit column dtypes.
     2. Filters out rows that have null values in any of the `insert_columns`.
     3. Logs discarded rows to a separate file for auditing.
     4. Prepares the filtered data for insertion.
@@ -111,9 +271,13 @@ def ingest_csv_to_db(
 
     :param csv_file_content: The content of the CSV file as bytes.
     :param db_conn: An active pyodbc database connection object.
+    :param cursor: The thread's reusable cursor on db_conn.
     :param table_name: The name of the target table in the database.
     :param target_columns: A list of column names expected in the CSV file, in order.
     :param insert_columns: A list of column names to be inserted into the database table.
+    :param insert_sql: The single-row INSERT statement for insert_columns, built once per run.
+    :param staging_container_client: Optional ContainerClient of the staging container.
+                                     When given, valid rows are loaded with BULK INSERT.
 
     :return: The number of rows successfully inserted into the database.
     :raises Exception: If an error occurs during processing or insertion,
@@ -121,48 +285,64 @@ def ingest_csv_to_db(
     """
     try:
         # Read CSV into a DataFrame, using target_columns for naming and no header.
-        df = pd.read_csv(io.StringIO(csv_file_content.decode('utf-8')),
+        # The C parser reads the raw bytes directly; id columns are parsed as
+        # nullable integers and everything else as strings.
+        column_dtypes = {col: 'Int64' if col == 'id' or col.endswith('_id') else 'string'
+                         for col in target_columns}
+        df = pd.read_csv(io.BytesIO(csv_file_content),
                          names=target_columns,
                          header=None,
-                         index_col=False)
-
-        # Create a combined filter to identify rows with nulls in any INSERT_COLUMNS.
-        combined_filter = pd.Series(True, index=df.index)
+                         index_col=False,
+                         encoding='utf-8',
+                         dtype=column_dtypes,
+                         usecols=target_columns,
+                         engine='c')
+
+        # Identify rows with nulls in any INSERT_COLUMNS with a single 2-D notna pass.
+        present_columns = [col for col in insert_columns if col in df.columns]
         for col in insert_columns:
-            if col in df.columns:
-                combined_filter = combined_filter & df[col].notna()
-            else:
+            if col not in df.columns:
                 logger.warning(f"The column '{col}' specified in INSERT_COLUMNS was not found in the DataFrame. "
                                f"The filter will not be applied for this column.")
+        combined_filter = df[present_columns].notna().all(axis=1)
 
         # Separate DataFrame into filtered (valid) and rejected (invalid) rows.
-        df_filtered = df[combined_filter].reset_index(drop=True).copy()
-        df_rejected = df[~combined_filter].copy()
+        df_filtered = df.loc[combined_filter].reset_index(drop=True)
+        df_rejected = df.loc[~combined_filter]
 
         rejected_rows_count = len(df_rejected)
 
         if rejected_rows_count > 0:
             logger.warning(f"They were found and discarded {rejected_rows_count} rows due to null values "
                            f"in key columns. See 'rejected hired employees.log'")
-            
-            # Log each rejected row as a JSON object for easier parsing.
-            for _, row in df_rejected.iterrows():
-                rejected_data = row.astype(str).to_dict()
-                rejected_rows_logger.warning(json.dumps(rejected_data))
-
-        data_to_insert = [tuple(row) for row in df_filtered[insert_columns].values]
+            log_rejected_rows(df_rejected)
+
+        if staging_container_client is not None and not df_filtered.empty:
+            bulk_insert_from_blob(staging_container_client, cursor, table_name, df_filtered[target_columns])
+            db_conn.commit()
+            logger.info(f"Bulk inserted {len(df_filtered)} rows in '{table_name}'.")
+            return len(df_filtered)
+
+        # Cast to object and turn missing values into None so pyodbc gets plain
+        # Python values (not NumPy scalars) it can bind directly; itertuples
+        # yields the row tuples without building an intermediate 2-D array.
+        df_insert = df_filtered[insert_columns].astype(object)
+        df_insert = df_insert.where(df_insert.notna(), None)
+        data_to_insert = list(df_insert.itertuples(index=False, name=None))
         
         if not data_to_insert:
             logger.info("There are no rows to insert after processing.")
             return 0
 
-        # Prepare and execute the bulk insert.
-        cursor = db_conn.cursor()
-        placeholders = ', '.join(['?' for _ in insert_columns])
-        insert_sql = f"INSERT INTO {table_name} ({', '.join(insert_columns)}) VALUES ({placeholders})"
-        cursor.executemany(insert_sql, data_to_insert)
+        # Execute the bulk insert. fast_executemany sends each chunk as a single
+        # parameter array instead of one round-trip per row, and reusing the same
+        # cursor and SQL text keeps the statement prepared across chunks and files.
+        if getattr(cursor, 'fast_executemany', False):
+            for start in range(0, len(data_to_insert), INSERT_CHUNK_SIZE):
+                cursor.executemany(insert_sql, data_to_insert[start:start + INSERT_CHUNK_SIZE])
+        else:
+            insert_multi_values(cursor, table_name, insert_columns, data_to_insert)
         db_conn.commit()
-        cursor.close()
         logger.info(f"Inserted {len(data_to_insert)} rows in '{table_name}'.")
         return len(data_to_insert)
 
@@ -173,60 +353,104 @@ def ingest_csv_to_db(
             logger.info("Database transaction rolled back.")
         raise
 
+def process_blob(container_client, blob_name, target_table_name, target_columns, insert_columns,
+                 insert_sql, staging_container_client=None) -> int:
+    """
+    Downloads a single CSV blob and ingests it into the database.
+
+    The ingest runs on the calling thread's own connection and cursor, because
+    pyodbc connections must not be shared between the loader's worker threads.
+
+    :param container_client: The ContainerClient holding the CSV blobs.
+    :param blob_name: The name of the blob to download and ingest.
+    :param target_table_name: The name of the database table to insert data into.
+    :param target_columns: List of column names expected in the CSV.
+    :param insert_columns: List of column names to insert into the database.
+    :param insert_sql: The single-row INSERT statement for insert_columns.
+    :param staging_container_client: Optional ContainerClient used for the BULK INSERT path.
+
+    :return: The number of rows inserted from the blob.
+    :raises Exception: If the connection cannot be opened or the ingestion fails.
+    """
+    logger.info(f"Processing CSV file: {blob_name}")
+    blob_client = container_client.get_blob_client(blob_name)
+    download_stream = blob_client.download_blob(max_concurrency=BLOB_DOWNLOAD_CONCURRENCY).readall()
+
+    db_conn, cursor = get_thread_cursor()
+    if not db_conn:
+        raise ConnectionError("Could not connect to the database.")
+
+    return ingest_csv_to_db(
+        download_stream,
+        db_conn,
+        cursor,
+        target_table_name,
+        target_columns,
+        insert_columns,
+        insert_sql,
+        staging_container_client)
+
 # --- Main Execution Flow ---
 
-def main(file_name, target_table_name, target_columns, insert_columns):
+def main(file_name, target_table_name, target_columns, insert_columns, blob_prefix=None):
     """
     Main function to orchestrate the data ingestion process.
 
     This function performs the following high-level steps:
     1. Connects to Azure Blob Storage.
-    2. Connects to the SQL Server database.
-    3. Iterates through blobs in the specified container, looking for the target CSV file.
-    4. Downloads and processes each relevant CSV file, ingesting its data into the database.
-    5. Logs overall progress and summarizes the results.
-    6. Ensures database connection is closed gracefully.
+    2. Lists the blobs under the given prefix and keeps the ones matching the target CSV file.
+    3. Downloads and ingests the matching files concurrently, each worker reusing
+       its own database connection and cursor across files.
+    4. Logs overall progress and summarizes the results.
 
     :param file_name: The name of the CSV file to look for in the Blob Storage.
     :param target_table_name: The name of the database table to insert data into.
     :param target_columns: List of column names expected in the CSV.
     :param insert_columns: List of column names to insert into the database.
+    :param blob_prefix: Optional blob name prefix used to filter the listing server-side.
+                        Defaults to the directory part of file_name, if any.
     """
+    if blob_prefix is None:
+        file_dir = os.path.dirname(file_name)
+        blob_prefix = f"{file_dir}/" if file_dir else None
+
     blob_service_client = get_blob_service_client()
     container_client = blob_service_client.get_container_client(BLOB_CONTAINER_NAME)
     logger.info(f"Connected to the Blob Storage container: {BLOB_CONTAINER_NAME}")
 
-    db_conn = get_sql_server_connection()
-    if not db_conn:
-        logger.error("Could not connect to the database. Aborting.")
-        return
+    staging_container_client = None
+    if BULK_DATA_SOURCE:
+        staging_container_client = blob_service_client.get_container_client(BLOB_CONTAINER_NAME_STAGING)
+        logger.info(f"Loading with BULK INSERT through '{BULK_DATA_SOURCE}' "
+                    f"staged in container: {BLOB_CONTAINER_NAME_STAGING}")
+
+    # The INSERT text only depends on the table and columns, so build it once.
+    placeholders = ', '.join(['?' for _ in insert_columns])
+    insert_sql = f"INSERT INTO {target_table_name} ({', '.join(insert_columns)}) VALUES ({placeholders})"
 
     total_files_processed = 0
     total_rows_ingested = 0
 
     try:
-        blob_list = container_client.list_blobs()
-        
-        # Iterate over each blob in the container.
-        for blob in blob_list:
-            if file_name.lower() in blob.name.lower():
-                logger.info(f"Processing CSV file: {blob.name}")
-                
-                try:
-                    blob_client = container_client.get_blob_client(blob.name)
-                    download_stream = blob_client.download_blob().readall()
-                    
-                    rows_ingested_from_file = ingest_csv_to_db(
-                        download_stream,
-                        db_conn,
-                        target_table_name,
-                        target_columns,
-                        insert_columns)
-                    total_rows_ingested += rows_ingested_from_file
-                    total_files_processed += 1
-                    
-                except Exception as file_e:
-                    logger.error(f"Failed to process file {blob.name}: {file_e}", exc_info=True)
+        # Let the service filter by prefix; the substring check stays as a guard.
+        blob_names = [blob.name for blob in container_client.list_blobs(name_starts_with=blob_prefix)
+                      if file_name.lower() in blob.name.lower()]
+
+        if blob_names:
+            # Downloads and inserts are network-bound, so process files concurrently.
+            with ThreadPoolExecutor(max_workers=min(LOADER_WORKERS, len(blob_names))) as executor:
+                futures = {
+                    executor.submit(process_blob, container_client, blob_name,
+                                    target_table_name, target_columns, insert_columns,
+                                    insert_sql, staging_container_client): blob_name
+                    for blob_name in blob_names
+                }
+                for future in as_completed(futures):
+                    try:
+                        total_rows_ingested += future.result()
+                        total_files_processed += 1
+                    except Exception as file_e:
+                        logger.error(f"Failed to process file {futures[future]}: {file_e}", exc_info=True)
 
         logger.info("--- Historical Ingestion Process Completed ---")
         logger.info(f"Processed CSV files: {total_files_processed}")
@@ -235,9 +459,7 @@ def main(file_name, target_table_name, target_columns, insert_columns):
     except Exception as e:
         logger.error(f"General error during the migration process: {e}", exc_info=True)
     finally:
-        if db_conn:
-            db_conn.close()
-            logger.info("Connection to SQL Server closed.")
+        close_thread_connections()
 
 # --- Script Entry Point ---
 if __name__ == "__main__":
@@ -251,8 +473,10 @@ if __name__ == "__main__":
                         help=f'Comma-separated list of column names in the CSV.')
     parser.add_argument("--insert_columns", type=str,
                         help=f'Comma-separated list of column names to insert into DB.')
+    parser.add_argument("--blob_prefix", type=str, default=None,
+                        help=f'Optional blob name prefix to narrow the container listing.')
     args = parser.parse_args()
 
     parsed_target_columns  = json.loads(args.target_columns)
     parsed_insert_columns = json.loads(args.insert_columns)
-    main(args.file_name, args.target_table_name, parsed_target_columns, parsed_insert_columns)
+    main(args.file_name, args.target_table_name, parsed_target_columns, parsed_insert_columns, args.blob_prefix)